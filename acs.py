@@ -0,0 +1,31 @@
+# acs.py
+"""
+ACS 5-year county metrics for Indiana.
+────────────────────────────────────────────────────────────────────────────
+Shared by app.py (live refresh / cache fill) and tools/bake_acs.py, so the
+query and the ROI / tax-rate math live in one place.
+"""
+import orjson, requests, numpy as np, pandas as pd
+
+URL = (
+    "https://api.census.gov/data/2022/acs/acs5"
+    "?get=NAME,B25064_001E,B25077_001E,B25092_001E"
+    "&for=county:*&in=state:18"
+)
+
+def download(session=requests):
+    """Median rent/value/tax per county → NAME, fips, rental_roi, property_tax_rate."""
+    r = session.get(URL, timeout=30)
+    r.raise_for_status()
+    resp = orjson.loads(r.content)
+    cols = resp[0]
+    # one object ndarray sliced into columns; reshape keeps it 2-D when the
+    # API returns a header with no rows
+    arr = np.array(resp[1:], dtype=object).reshape(-1, len(cols))
+    df = pd.DataFrame({c: arr[:, i] for i, c in enumerate(cols)})
+    for c in ("B25064_001E","B25077_001E","B25092_001E"):
+        df[c] = pd.to_numeric(df[c], errors="coerce", downcast="float")
+    df["fips"] = df["state"] + df["county"]
+    df["rental_roi"] = (df["B25064_001E"] * 12) / df["B25077_001E"]
+    df["property_tax_rate"] = df["B25092_001E"] / df["B25077_001E"]
+    return df[["NAME","fips","rental_roi","property_tax_rate"]]
@@ -2,39 +2,260 @@
 """
 Indiana County Rental ROI & Property-Tax Heatmap  🗺️🏡
 ────────────────────────────────────────────────────────────────────────────
-Fetches live ACS data and overlays it on a public GeoJSON of US counties.
+Overlays ACS 5-year county estimates on Indiana county polygons. Each is
+read from an optional baked snapshot in data/ (see tools/; none committed
+yet), else a /tmp disk cache, else the network; ?refresh=1 re-pulls ACS.
 No shapefiles, no geopandas—runs on Python 3.12 in Streamlit Cloud.
 """
-import json, requests, pandas as pd, streamlit as st, folium
-from streamlit_folium import folium_static
+import hashlib, os, pickle, tempfile, time, orjson, requests, pandas as pd, streamlit as st, folium
+import acs, counties
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from branca.colormap import linear
+from branca.element import MacroElement
+from jinja2 import Template
+from requests.adapters import HTTPAdapter
+
+# st.iframe supersedes st.components.v1.html, which newer releases drop
+if hasattr(st, "iframe"):
+    embed_html = st.iframe
+else:
+    import streamlit.components.v1 as components
+    embed_html = components.html
+
+# one pooled session for api.census.gov / raw.githubusercontent.com
+SESSION = requests.Session()
+SESSION.headers["Accept-Encoding"] = "gzip, deflate"
+SESSION.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=4))
+
+# ────────────────────────────── DISK CACHE ──────────────────────────────
+# st.cache_data is per-process; a cold container would re-download on boot.
+CACHE_TTL = 30 * 24 * 3600  # seconds
+
+def _disk_cache(path, fetcher, loader, writer):
+    """Return loader(path) if a fresh copy exists, else fetch and persist."""
+    if os.path.exists(path) and time.time() - os.path.getmtime(path) < CACHE_TTL:
+        try:
+            return loader(path)
+        except (OSError, ValueError):
+            pass  # unreadable/corrupt copy: treat as a miss and refetch
+    obj = fetcher()
+    try:
+        _atomic_write(obj, path, writer)
+    except OSError:
+        pass  # read-only FS: still serve the fresh fetch
+    return obj
+
+def _atomic_write(obj, path, writer):
+    """writer(obj, tmp) then rename, so readers never see a partial file."""
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path) or ".", suffix=".part")
+    os.close(fd)
+    try:
+        writer(obj, tmp)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+def _read_json(path):
+    with open(path, "rb") as f:
+        return orjson.loads(f.read())
+
+def _write_json(obj, path):
+    with open(path, "wb") as f:
+        f.write(orjson.dumps(obj))
 
 # ────────────────────────────── ACS DATA ────────────────────────────────
+# ACS 5-year estimates change yearly; tools/bake_acs.py (or ?refresh=1) writes
+# an optional snapshot here. None is committed yet.
+BAKED_ACS = os.path.join(os.path.dirname(__file__), "data", "indiana_acs_2022.parquet")
+
 @st.cache_data(show_spinner=False)
 def fetch_acs_indiana():
-    url = (
-        "https://api.census.gov/data/2022/acs/acs5"
-        "?get=NAME,B25064_001E,B25077_001E,B25092_001E"
-        "&for=county:*&in=state:18"
-    )
-    resp = requests.get(url, timeout=30).json()
-    cols = resp[0]
-    df = pd.DataFrame(resp[1:], columns=cols)
-    df[["B25064_001E","B25077_001E","B25092_001E"]] = df[
-        ["B25064_001E","B25077_001E","B25092_001E"]
-    ].astype(float)
-    df["fips"] = df["state"] + df["county"]
-    df["rental_roi"] = (df["B25064_001E"] * 12) / df["B25077_001E"]
-    df["property_tax_rate"] = df["B25092_001E"] / df["B25077_001E"]
-    return df[["NAME","fips","rental_roi","property_tax_rate"]]
+    """Pickled ACS frame. Callers key downstream caches on a sha1 of these
+    bytes, which is cheaper than pd.util.hash_pandas_object on every rerun.
+
+    Serves the baked snapshot; without one, falls back to the disk cache.
+    """
+    if os.path.exists(BAKED_ACS):
+        df = pd.read_parquet(BAKED_ACS)
+    else:
+        df = _disk_cache(
+            "/tmp/acs_in.parquet",
+            partial(acs.download, SESSION),
+            pd.read_parquet,
+            _write_parquet,
+        )
+    return pickle.dumps(df, protocol=5)
+
+def refresh_acs_indiana():
+    """Re-download ACS, overwrite the snapshot and drop the memoized copy,
+    so every later load—not just this one—serves the new frame."""
+    df = acs.download(SESSION)
+    # never replace a working snapshot with one the map can't draw
+    metrics = df[["rental_roi", "property_tax_rate"]].replace(
+        [float("inf"), -float("inf")], float("nan"))
+    if df.empty or metrics.isna().all().any():
+        raise ValueError("Census returned no usable rows; snapshot left unchanged")
+    os.makedirs(os.path.dirname(BAKED_ACS), exist_ok=True)
+    _atomic_write(df, BAKED_ACS, _write_parquet)
+    fetch_acs_indiana.clear()
+
+def _write_parquet(df, path):
+    df.to_parquet(path, index=False)
 
 # ──────────────────── GEOJSON LOAD & FILTER ────────────────────────────
+# Optional snapshot written by tools/bake_indiana_geojson.py (~90 features vs
+# ~3200 national). Not committed; until it is baked, the download path runs.
+BAKED_GEOJSON = os.path.join(os.path.dirname(__file__), "data", "indiana_counties.json")
+
 @st.cache_data(show_spinner=False)
 def fetch_indiana_counties_geojson():
-    url = "https://raw.githubusercontent.com/plotly/datasets/master/geojson-counties-fips.json"
-    gj = requests.get(url, timeout=30).json()
-    # keep only features with fips starting with "18" (Indiana)
-    feats = [f for f in gj["features"] if f["id"].startswith("18")]
-    return {"type": "FeatureCollection", "features": feats}
+    if os.path.exists(BAKED_GEOJSON):
+        return _read_json(BAKED_GEOJSON)
+    return _disk_cache(
+        "/tmp/in_counties.json",
+        partial(counties.download, SESSION),
+        _read_json,
+        _write_json,
+    )
+
+# ─────────────────── MAP PAYLOAD (both metrics) ─────────────────────────
+METRICS = {
+    "rental_roi": "Rental ROI (%)",
+    "property_tax_rate": "Property Tax Rate (%)",
+}
+NAN_FILL = "#cccccc"
+
+def build_map_payload(df, geojson):
+    """Counties annotated with every metric, plus a legend per metric.
+
+    Each feature carries `<metric>_fmt` (tooltip text) and `<metric>_fill`
+    (hex colour) so the browser can switch metrics without a rerun.
+    """
+    props = df[["fips", "NAME"]].copy()
+    legends = {}
+    # counties without a usable ACS row still need every tooltip/style field
+    defaults = {"NAME": None}
+    for col, label in METRICS.items():
+        defaults[f"{col}_fmt"], defaults[f"{col}_fill"] = "n/a", NAN_FILL
+        pct = (df[col] * 100).round(2)
+        pct = pct[pct.abs() != float("inf")].dropna()
+        if pct.empty:
+            legends[col] = f"<b>{label}</b><div>no data</div>"
+            continue
+        cmap = linear.YlGnBu_09.scale(pct.min(), pct.max()).to_step(6)
+        cmap.caption = label
+        legends[col] = _legend_html(cmap)
+        props[f"{col}_fmt"] = pct.map("{:.2f}%".format).reindex(df.index, fill_value="n/a")
+        props[f"{col}_fill"] = pct.map(cmap).reindex(df.index, fill_value=NAN_FILL)
+    by_fips = props.set_index("fips").to_dict("index")
+    feats = [
+        {**f, "properties": {
+            **defaults, **f.get("properties", {}), **by_fips.get(f["id"], {})
+        }}
+        for f in geojson["features"]
+    ]
+    return {"type": "FeatureCollection", "features": feats}, legends
+
+def _legend_html(cmap):
+    """Caption plus one swatch per step bin, from the colormap's public bins."""
+    rows = "".join(
+        f'<div><span style="display:inline-block;width:14px;height:10px;'
+        f'margin-right:4px;background:{cmap(lo)}"></span>{lo:.2f} – {hi:.2f}</div>'
+        for lo, hi in zip(cmap.index[:-1], cmap.index[1:])
+    )
+    return f"<b>{cmap.caption}</b>{rows}"
+
+@st.cache_data(show_spinner=False)
+def csv_bytes(df_hash, _df):
+    """Encoded download payload; built once per data hash, not per rerun."""
+    return (
+        _df[["NAME","rental_roi","property_tax_rate"]]
+        .rename(columns={"NAME":"county"})
+        .to_csv(index=False)
+        .encode()
+    )
+
+# ─────────────────── CLIENT-SIDE METRIC TOGGLE ──────────────────────────
+class MetricToggle(MacroElement):
+    """Leaflet control that restyles `layer` from `<metric>_fill` properties
+    and shows the matching legend—no Streamlit rerun on switch."""
+    _template = Template("""
+        {% macro script(this, kwargs) %}
+        (function () {
+            var layer = {{ this.layer.get_name() }};
+            var ctl = L.control({position: "topright"});
+            ctl.onAdd = function () {
+                var div = L.DomUtil.create("div", "leaflet-control-layers leaflet-control-layers-expanded");
+                div.innerHTML = {{ this.html|tojson }};
+                L.DomEvent.disableClickPropagation(div);
+                div.addEventListener("change", function (e) {
+                    var key = e.target.value;
+                    layer.setStyle(function (f) {
+                        return {fillColor: f.properties[key + "_fill"] || {{ this.nan_fill|tojson }}};
+                    });
+                    div.querySelectorAll("[data-legend]").forEach(function (el) {
+                        el.style.display = el.dataset.legend === key ? "" : "none";
+                    });
+                });
+                return div;
+            };
+            ctl.addTo({{ this._parent.get_name() }});
+        })();
+        {% endmacro %}
+    """)
+
+    def __init__(self, layer, legends, default):
+        super().__init__()
+        self._name = "MetricToggle"
+        self.layer = layer
+        self.nan_fill = NAN_FILL
+        radios = "".join(
+            f'<label><input type="radio" name="metric" value="{col}"'
+            f'{" checked" if col == default else ""}> {label}</label><br>'
+            for col, label in METRICS.items()
+        )
+        hidden = ' style="display:none"'
+        keys = "".join(
+            f'<div data-legend="{col}"{"" if col == default else hidden}>{svg}</div>'
+            for col, svg in legends.items()
+        )
+        self.html = radios + keys
+
+# ──────────────────────────── MAP BUILD ─────────────────────────────────
+def build_map(geojson, legends):
+    """One GeoJson layer carrying every metric; the toggle restyles it in JS."""
+    default = next(iter(METRICS))
+    m = folium.Map(
+        location=[40.27, -86.13], zoom_start=7, tiles="cartodbpositron",
+        prefer_canvas=True,
+    )
+    layer = folium.GeoJson(
+        geojson,
+        name="counties",
+        style_function=lambda f: {
+            "fillColor": f["properties"].get(f"{default}_fill", NAN_FILL),
+            "fillOpacity": 0.8,
+            "color": "black",
+            "weight": 1,
+            "opacity": 0.2,
+        },
+        tooltip=folium.features.GeoJsonTooltip(
+            fields=["NAME"] + [f"{col}_fmt" for col in METRICS],
+            aliases=["County"] + list(METRICS.values()),
+            labels=True,
+            sticky=False
+        ),
+    ).add_to(m)
+    MetricToggle(layer, legends, default).add_to(m)
+    return m
+
+@st.cache_data(show_spinner=False)
+def render_map_html(df_hash, _df, _geojson):
+    """Full map HTML, keyed on the ACS data hash. Payload annotation and the
+    Jinja pass only run on a miss; hits return the string alone."""
+    return build_map(*build_map_payload(_df, _geojson)).get_root().render()
 
 # ──────────────────────────────────────────────────────────────────────────
 st.set_page_config(page_title="Indiana ROI & Tax Heatmap", layout="wide")
@@ -42,74 +263,38 @@ st.title("📍 Indiana County Rental ROI & Property-Tax Heatmap")
 
 st.info(
     "🔔 **Demo Notice**  \n"
-    "Live ACS data + public GeoJSON—no shapefiles or geopandas needed. "
+    "Census ACS 5-year data (cached; add `?refresh=1` to the URL to re-pull) "
+    "+ public GeoJSON—no shapefiles or geopandas needed. "
     "For enterprise geospatial analytics, [contact me](https://drtomharty.com/bio).",
     icon="💡"
 )
 
-# load data
-with st.spinner("Fetching data…"):
-    df = fetch_acs_indiana()
-    geojson = fetch_indiana_counties_geojson()
-
-# choose metric
-metric = st.radio(
-    "Select metric",
-    ["Rental ROI (%)", "Property Tax Rate (%)"],
-    index=0,
-    help="ROI = (median rent × 12) ÷ median home value"
-)
+# ?refresh=1 re-pulls ACS into the snapshot once, then drops the param so
+# reruns of this page don't hit the API again
+if st.query_params.get("refresh") == "1":
+    with st.spinner("Refreshing ACS data…"):
+        try:
+            refresh_acs_indiana()
+        except (OSError, ValueError) as e:  # network/HTTP, FS, bad payload
+            st.warning(f"Could not refresh ACS data: {e}")
+    del st.query_params["refresh"]
 
-if metric.startswith("Rental"):
-    df["value"] = df["rental_roi"] * 100
-    legend = "Rental ROI (%)"
-else:
-    df["value"] = df["property_tax_rate"] * 100
-    legend = "Property Tax Rate (%)"
-
-# build map
-m = folium.Map(location=[40.27, -86.13], zoom_start=7, tiles="cartodbpositron")
-folium.Choropleth(
-    geo_data=geojson,
-    data=df,
-    columns=["fips", "value"],
-    key_on="feature.id",
-    fill_color="YlGnBu",
-    fill_opacity=0.8,
-    line_opacity=0.2,
-    legend_name=legend,
-).add_to(m)
-
-# tooltip shows both county name and metric
-tooltip = folium.features.GeoJsonTooltip(
-    fields=["NAME"],
-    aliases=["County"],
-    labels=True,
-    sticky=False
-)
-folium.GeoJson(
-    geojson,
-    name="labels",
-    style_function=lambda _: {"fillOpacity": 0, "color": "transparent"},
-    tooltip=tooltip
-).add_to(m)
-
-# add custom tooltips via JavaScript popup on hover
-for _, row in df.iterrows():
-    folium.features.GeoJson(
-        {"type": "Feature", "geometry": next(f["geometry"] for f in geojson["features"] if f["id"] == row.fips)},
-        tooltip=folium.Tooltip(f"{row.NAME}: {row.value:.2f}%")
-    ).add_to(m)
+# load data — the two downloads are independent, so run them side by side
+with st.spinner("Fetching data…"), ThreadPoolExecutor(max_workers=2) as ex:
+    acs_future = ex.submit(fetch_acs_indiana)
+    geo_future = ex.submit(fetch_indiana_counties_geojson)
+    acs_blob, geojson = acs_future.result(), geo_future.result()
+df = pickle.loads(acs_blob)
+
+st.caption("ROI = (median rent × 12) ÷ median home value · switch metrics on the map")
 
-folium_static(m, width=900, height=600)
+df_hash = hashlib.sha1(acs_blob).hexdigest()
+embed_html(render_map_html(df_hash, df, geojson), width=900, height=600)
 
 # download CSV
 st.download_button(
     "⬇️ Download data CSV",
-    data=df[["NAME","rental_roi","property_tax_rate"]]
-         .rename(columns={"NAME":"county"})
-         .to_csv(index=False)
-         .encode(),
+    data=csv_bytes(df_hash, df),
     file_name="indiana_county_roi_tax.csv",
     mime="text/csv"
 )
@@ -0,0 +1,18 @@
+# counties.py
+"""
+Indiana county polygons from plotly's public US-counties GeoJSON.
+────────────────────────────────────────────────────────────────────────────
+Shared by app.py (cache fill) and tools/bake_indiana_geojson.py.
+"""
+import orjson, requests
+
+URL = "https://raw.githubusercontent.com/plotly/datasets/master/geojson-counties-fips.json"
+STATE_FIPS = "18"  # Indiana
+
+def download(session=requests):
+    """National file filtered to Indiana features (FIPS prefix STATE_FIPS)."""
+    r = session.get(URL, timeout=30)
+    r.raise_for_status()
+    gj = orjson.loads(r.content)
+    feats = [f for f in gj["features"] if f["id"].startswith(STATE_FIPS)]
+    return {"type": "FeatureCollection", "features": feats}
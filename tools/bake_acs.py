@@ -0,0 +1,25 @@
+# tools/bake_acs.py
+"""
+Bake the ACS 5-year Indiana metrics shipped with the app.
+────────────────────────────────────────────────────────────────────────────
+Runs acs.download (the query and math app.py uses) and writes
+data/indiana_acs_2022.parquet.  Re-run when a new ACS release lands.
+
+    python tools/bake_acs.py
+"""
+import os, sys
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir)
+sys.path.insert(0, ROOT)
+import acs  # noqa: E402
+
+OUT = os.path.join(ROOT, "data", "indiana_acs_2022.parquet")
+
+def main():
+    df = acs.download()
+    os.makedirs(os.path.dirname(OUT), exist_ok=True)
+    df.to_parquet(OUT, index=False)
+    print(f"wrote {len(df)} counties → {os.path.normpath(OUT)}")
+
+if __name__ == "__main__":
+    main()
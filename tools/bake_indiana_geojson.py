@@ -0,0 +1,33 @@
+# tools/bake_indiana_geojson.py
+"""
+Bake the Indiana-only county GeoJSON shipped with the app.
+────────────────────────────────────────────────────────────────────────────
+Runs counties.download (national plotly file → 92 Indiana features),
+simplifies the polygons for zoom-7 display and writes
+data/indiana_counties.json.  Needs shapely (bake time only):
+
+    pip install -r requirements-dev.txt
+    python tools/bake_indiana_geojson.py
+"""
+import os, sys, orjson
+from shapely.geometry import mapping, shape
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir)
+sys.path.insert(0, ROOT)
+import counties  # noqa: E402
+
+TOLERANCE = 0.002  # degrees (~200 m); invisible at the app's zoom level
+OUT = os.path.join(ROOT, "data", "indiana_counties.json")
+
+def main():
+    gj = counties.download()
+    for f in gj["features"]:
+        g = shape(f["geometry"]).simplify(TOLERANCE, preserve_topology=True)
+        f["geometry"] = mapping(g)
+    os.makedirs(os.path.dirname(OUT), exist_ok=True)
+    with open(OUT, "wb") as f:
+        f.write(orjson.dumps(gj))
+    print(f"wrote {len(gj['features'])} features → {os.path.normpath(OUT)}")
+
+if __name__ == "__main__":
+    main()